@@ -1,6 +1,7 @@
 import logging.config
 import os
 import sys
+import threading
 import warnings
 
 from flask import Flask
@@ -28,6 +29,32 @@ def silence_warnings(config_name):
         warnings.simplefilter("ignore")
 
 
+def warm_up(app):
+    """
+    Load resources that would otherwise be initialized by the first request.
+    """
+    import tiktoken
+
+    from app.services.datastore.duckdb_datastore import get_datastore
+    from app.services.llm.session import get_llm_session
+    from app.services.llm.tools import text_to_sql
+
+    try:
+        with app.app_context():
+            # Loading the BPE ranks reads (and on first use downloads) the encoding file
+            tiktoken.get_encoding("p50k_base")
+            get_llm_session(
+                chat_model=app.config.get("CHAT_MODEL"),
+                embedding_model=app.config.get("EMBEDDING_MODEL"),
+            )
+            # Open the tool database and touch its catalog once
+            get_datastore(text_to_sql.DATABASE, read_only=True).execute(
+                "SELECT table_name FROM information_schema.tables"
+            )
+    except Exception as e:
+        logger.warning("Warm-up failed, resources will load on first request: %s", e)
+
+
 def create_app(config_name):
     from app.routes import routes
 
@@ -46,4 +73,15 @@ def create_app(config_name):
     ma.init_app(app)
     mail.init_app(app)
 
+    fast_chat_model = app.config.get("CHAT_MODEL_FAST")
+    if fast_chat_model:
+        from app.services.llm.session import LLMSession
+
+        # Fail at startup rather than on the first message routed to the fast model
+        LLMSession.validate_chat_model(fast_chat_model)
+
+    if app.config.get("WARMUP_ON_START"):
+        # Run in the background so startup is not blocked on the warm-up
+        threading.Thread(target=warm_up, args=(app,), name="warm-up", daemon=True).start()
+
     return app
\ No newline at end of file
@@ -1,21 +1,64 @@
-from typing import Dict, List
-from flask import current_app, g
+from typing import Dict, List, Optional
+from flask import current_app
 
 from app import logger
 from app.core.commands import ReadCommand
 from app.errors import ValidationException
+from app.services.datastore.duckdb_datastore import DuckDBDatastore
 from app.services.llm.prompts.chat_prompt import chat_prompt
-from app.services.llm.session import LLMSession
-from app.services.llm.structured_outputs import text_to_sql
+from app.services.llm.session import get_llm_session
 from app.services.llm.tools.text_to_sql import text_to_sql as text_to_sql_tool
 from app.utils.formatters import get_timestamp
 
+from concurrent.futures import ThreadPoolExecutor
 from langfuse.decorators import observe
 from openai import BadRequestError
+from types import SimpleNamespace
 from vaul import Toolkit
 from uuid import uuid4
 
-import json
+import contextvars
+import orjson
+import re
+
+# Messages that are already a read-only SQL statement (uppercase keywords, so
+# prose such as "select the top customers from..." still goes to the LLM)
+DIRECT_SQL_PATTERN = re.compile(r"^\s*(?:SELECT|WITH)\s[\s\S]*\bFROM\b")
+
+# Messages that are only a greeting, a request for help or thanks; these get a
+# canned reply instead of a round-trip to the LLM
+GREETING_PATTERN = re.compile(
+    r"^\s*(?:hi|hello|hey|help|what can you do|how are you)(?:\s+there)?[\s!?.,]*$",
+    re.IGNORECASE,
+)
+GREETING_REPLY = (
+    "Hello! I can answer questions about the data in the database by writing "
+    "and running SQL for you. Ask me something like \"How many customers are "
+    "there?\" or paste a SELECT statement to run it directly."
+)
+THANKS_PATTERN = re.compile(
+    r"^\s*(?:thanks|thank you)(?:\s+(?:so much|a lot))?[\s!?.,]*$",
+    re.IGNORECASE,
+)
+THANKS_REPLY = "You're welcome! Let me know if there is anything else you'd like to look up."
+
+# A short opening message with no data or SQL vocabulary is sent to
+# CHAT_MODEL_FAST, when one is configured; follow-ups always use CHAT_MODEL
+FAST_CHAT_MODEL_MAX_WORDS = 6
+DATA_QUESTION_PATTERN = re.compile(
+    r"\b(?:select|from|where|join|group|order|count|sum|avg|average|total|top|table|rows?"
+    r"|show|list|find|get|which|how many|how much|per|by|break|compare|trend|rank"
+    r"|revenue|sales|customers?|orders?|products?|month|year|quarter|\d{4})\b",
+    re.IGNORECASE,
+)
+
+# Upper bound on tool calls from a single response run at the same time
+MAX_PARALLEL_TOOL_CALLS = 4
+
+# Tools offered to the chat model; built once and shared by every command
+TOOLKIT = Toolkit()
+TOOLKIT.add_tools(text_to_sql_tool)
+TOOL_SCHEMAS = TOOLKIT.tool_schemas()
 
 
 class ProcessChatMessageCommand(ReadCommand):
@@ -24,12 +67,33 @@ class ProcessChatMessageCommand(ReadCommand):
     """
     def __init__(self, chat_messages: List[Dict[str, str]]) -> None:
         self.chat_messages = chat_messages
-        self.llm_session = LLMSession(
-            chat_model=current_app.config.get("CHAT_MODEL"),
+        self.chat_model_tier = self.get_chat_model_tier()
+        chat_model = current_app.config.get(
+            "CHAT_MODEL_FAST" if self.chat_model_tier == "fast" else "CHAT_MODEL"
+        )
+        self.llm_session = get_llm_session(
+            chat_model=chat_model,
             embedding_model=current_app.config.get("EMBEDDING_MODEL"),
         )
-        self.toolkit = Toolkit()
-        self.toolkit.add_tools(*[text_to_sql_tool])
+        self.toolkit = TOOLKIT
+
+    def get_chat_model_tier(self) -> str:
+        """
+        Return "fast" when the conversation is a single short user message that is
+        not a data question, otherwise "full".
+        """
+        if not current_app.config.get("CHAT_MODEL_FAST") or len(self.chat_messages) != 1:
+            return "full"
+
+        message = self.chat_messages[0]
+        content = message.get("content") or ""
+        if (
+            message.get("role") == "user"
+            and len(content.split()) < FAST_CHAT_MODEL_MAX_WORDS
+            and not DATA_QUESTION_PATTERN.search(content)
+        ):
+            return "fast"
+        return "full"
 
     def validate(self) -> None:
         """
@@ -45,14 +109,26 @@ class ProcessChatMessageCommand(ReadCommand):
         Execute the command.
         """
         logger.debug(
-            f'Command {self.__class__.__name__} started with {len(self.chat_messages)} messages.'
+            "Command %s started with %d messages.",
+            self.__class__.__name__,
+            len(self.chat_messages),
         )
 
         self.validate()
 
+        canned_reply = self.get_canned_reply()
+        if canned_reply:
+            return self.reply_without_llm(canned_reply)
+
+        direct_sql = self.get_direct_sql()
+        if direct_sql:
+            return self.run_direct_sql(direct_sql)
+
         chat_kwargs = {
             "messages": self.prepare_chat_messages(),
-            "tools": self.toolkit.tool_schemas(),
+            "tools": TOOL_SCHEMAS,
+            # Tagged on the Langfuse trace so the routing can be tuned later
+            "metadata": {"tags": [f"chat_model:{self.chat_model_tier}"]},
         }
 
         try:
@@ -60,7 +136,7 @@ class ProcessChatMessageCommand(ReadCommand):
         except BadRequestError as e:
             raise e
         except Exception as e:
-            logger.error(f"Failed to fetch chat response: {e}")
+            logger.error("Failed to fetch chat response: %s", e)
             raise ValidationException("Error in fetching chat response.")
 
         tool_messages = []
@@ -88,13 +164,13 @@ class ProcessChatMessageCommand(ReadCommand):
 
             response_message = self.format_message(**response_message_config)
 
-            for tool_call in tool_calls:
-                tool_run = self.execute_tool_call(tool_call)
+            tool_runs = self.execute_tool_calls(tool_calls)
+            for tool_call, tool_run in zip(tool_calls, tool_runs):
                 tool_messages.append(
                     self.format_message(
                         role="tool",
                         tool_call_id=tool_call.id,
-                        content=json.dumps(tool_run),
+                        content=orjson.dumps(tool_run).decode(),
                     )
                 )
         else:
@@ -107,6 +183,98 @@ class ProcessChatMessageCommand(ReadCommand):
         return self.chat_messages
     
 
+    def get_canned_reply(self) -> Optional[str]:
+        """
+        Return a canned reply when the latest user message is only a greeting,
+        a request for help or thanks, otherwise None.
+        """
+        last_message = self.chat_messages[-1]
+        if last_message.get("role") != "user":
+            return None
+        content = last_message.get("content") or ""
+        if GREETING_PATTERN.match(content):
+            return GREETING_REPLY
+        if THANKS_PATTERN.match(content):
+            return THANKS_REPLY
+        return None
+
+    @observe()
+    def reply_without_llm(self, content: str) -> list:
+        """
+        Answer with a canned reply without calling the LLM.
+        """
+        logger.debug("Answering with a canned reply without an LLM round-trip.")
+
+        self.chat_messages.append(
+            self.format_message(
+                role="assistant",
+                content=content,
+                finish_reason="stop",
+            )
+        )
+
+        return self.chat_messages
+
+    def get_direct_sql(self) -> Optional[str]:
+        """
+        Return the latest user message when it is exactly one SELECT statement,
+        otherwise None so the message goes to the LLM (for example SQL followed by
+        a question about it).
+        """
+        last_message = self.chat_messages[-1]
+        content = last_message.get("content") or ""
+        if (
+            last_message.get("role") == "user"
+            and DIRECT_SQL_PATTERN.match(content)
+            and DuckDBDatastore.is_single_select(content)
+        ):
+            return content.strip().rstrip(";").rstrip()
+        return None
+
+    @observe()
+    def run_direct_sql(self, sql: str) -> list:
+        """
+        Run a user-supplied SQL statement through the text_to_sql tool without
+        asking the LLM to generate it, recording the same messages a tool call would.
+        """
+        logger.debug("Running user-supplied SQL without an LLM round-trip.")
+
+        # Shaped like a tool call from a chat response so it runs through execute_tool_call
+        tool_call = SimpleNamespace(
+            id=f"call_{uuid4().hex}",
+            function=SimpleNamespace(
+                name="text_to_sql",
+                arguments=orjson.dumps({"query": sql}).decode(),
+            ),
+        )
+
+        response_message = self.format_message(
+            role="assistant",
+            content=None,
+            finish_reason="tool_calls",
+            tool_calls=[
+                {
+                    "id": tool_call.id,
+                    "type": "function",
+                    "function": {
+                        "name": tool_call.function.name,
+                        "arguments": tool_call.function.arguments,
+                    },
+                }
+            ],
+        )
+        tool_run = self.execute_tool_call(tool_call)
+        tool_message = self.format_message(
+            role="tool",
+            tool_call_id=tool_call.id,
+            content=orjson.dumps(tool_run).decode(),
+        )
+
+        self.chat_messages.append(response_message)
+        self.chat_messages.append(tool_message)
+
+        return self.chat_messages
+
     @observe()
     def prepare_chat_messages(self) -> list:
         trimmed_messages = self.llm_session.trim_message_history(
@@ -129,9 +297,27 @@ class ProcessChatMessageCommand(ReadCommand):
             **kwargs,
         }
 
+    def execute_tool_calls(self, tool_calls: list) -> list:
+        """
+        Run the requested tool calls, concurrently when there is more than one.
+        Results are returned in the same order as tool_calls.
+        """
+        if len(tool_calls) <= 1:
+            return [self.execute_tool_call(tool_call) for tool_call in tool_calls]
+
+        max_workers = min(len(tool_calls), MAX_PARALLEL_TOOL_CALLS)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Each call runs in a copy of the current context so the app context
+            # and the Langfuse trace carry over to the worker thread
+            futures = [
+                executor.submit(contextvars.copy_context().run, self.execute_tool_call, tool_call)
+                for tool_call in tool_calls
+            ]
+            return [future.result() for future in futures]
+
     @observe()
     def execute_tool_call(self, tool_call: dict) -> dict:
         return self.toolkit.run_tool(
             name=tool_call.function.name,
-            arguments=json.loads(tool_call.function.arguments),
+            arguments=orjson.loads(tool_call.function.arguments),
         )
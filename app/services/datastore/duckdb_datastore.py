@@ -1,7 +1,11 @@
+import atexit
 import duckdb
 import pandas as pd
-from typing import Optional, Dict, Any
-
+import queue
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Iterator, Optional, Dict, Any, Tuple
 
 
 class DuckDBDatastore:
@@ -9,17 +13,79 @@ class DuckDBDatastore:
     A datastore implementation for DuckDB.
     """
 
-    def __init__(self, database: Optional[str] = None) -> None:
+    CURSOR_POOL_SIZE = 4
+    CURSOR_WAIT_TIMEOUT = 30
+
+    def __init__(self, database: Optional[str] = None, read_only: bool = False) -> None:
         """
         Initialize the DuckDBDataStore.
 
         Args:
             database (str, optional): Path to the DuckDB database file.
                                       If None, an in-memory database is used.
+            read_only (bool, optional): Open the database file read-only, which
+                                        skips write locking and rejects writes.
+                                        Ignored for in-memory databases.
         """
         if database is None:
             database = ':memory:'
-        self.connection = duckdb.connect(database=database)
+        self.connection = duckdb.connect(
+            database=database,
+            read_only=read_only and database != ':memory:',
+            # Keep queries from reading or attaching files outside this database, and
+            # reject SET so one query cannot change settings for the shared instance
+            config={
+                "enable_external_access": False,
+                "lock_configuration": True,
+            },
+        )
+        self._idle_cursors = queue.LifoQueue()
+        self._cursor_count = 0
+        self._cursor_lock = threading.Lock()
+
+    @contextmanager
+    def cursor(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        """
+        Borrow a cursor from the datastore's pool.
+
+        DuckDB connections must not be used from several threads at once, so each
+        caller gets its own cursor. Up to CURSOR_POOL_SIZE cursors are created on
+        demand and reused; further callers wait up to CURSOR_WAIT_TIMEOUT seconds
+        for one to be returned.
+
+        Yields:
+            duckdb.DuckDBPyConnection: A cursor on the shared database.
+
+        Raises:
+            TimeoutError: If no cursor is returned to the pool in time.
+        """
+        try:
+            cursor = self._idle_cursors.get_nowait()
+        except queue.Empty:
+            with self._cursor_lock:
+                create = self._cursor_count < self.CURSOR_POOL_SIZE
+                if create:
+                    self._cursor_count += 1
+            if create:
+                try:
+                    cursor = self.connection.cursor()
+                except Exception:
+                    # Give the slot back so a failed cursor does not shrink the pool
+                    with self._cursor_lock:
+                        self._cursor_count -= 1
+                    raise
+            else:
+                try:
+                    cursor = self._idle_cursors.get(timeout=self.CURSOR_WAIT_TIMEOUT)
+                except queue.Empty:
+                    raise TimeoutError(
+                        f"No DuckDB cursor became available within {self.CURSOR_WAIT_TIMEOUT} seconds."
+                    ) from None
+
+        try:
+            yield cursor
+        finally:
+            self._idle_cursors.put(cursor)
 
     def execute(
         self, query: str, parameters: Optional[Dict[str, Any]] = None
@@ -34,11 +100,92 @@ class DuckDBDatastore:
         Returns:
             pd.DataFrame: The query result.
         """
-        if parameters:
-            return self.connection.execute(query, parameters).df()
-        else:
-            return self.connection.execute(query).df()
-        
+        with self.cursor() as cursor:
+            if parameters:
+                return cursor.execute(query, parameters).df()
+            else:
+                return cursor.execute(query).df()
+
+    def execute_head(
+        self, query: str, limit: int, parameters: Optional[Dict[str, Any]] = None
+    ) -> Tuple[pd.DataFrame, bool]:
+        """
+        Execute a SQL query and return only its first rows as a DataFrame.
+
+        Rows are converted to pandas one DuckDB chunk at a time and fetching stops
+        once more than `limit` rows are available, so large results are never fully
+        materialized in pandas. A partly read result is released before the cursor
+        is returned to the pool.
+
+        Args:
+            query (str): The SQL query to execute.
+            limit (int): Maximum number of rows to return.
+            parameters (Dict[str, Any], optional): Parameters to include in the query.
+
+        Returns:
+            Tuple[pd.DataFrame, bool]: The first `limit` rows, and whether the
+                                       result had more rows than that.
+        """
+        with self.cursor() as cursor:
+            if parameters:
+                cursor.execute(query, parameters)
+            else:
+                cursor.execute(query)
+
+            chunks = [cursor.fetch_df_chunk()]
+            fetched = len(chunks[0])
+            while fetched <= limit and len(chunks[-1]):
+                chunks.append(cursor.fetch_df_chunk())
+                fetched += len(chunks[-1])
+
+            if len(chunks[-1]):
+                # Stopped before the end of the result; replace it with a trivial one
+                # so its buffers are freed before the cursor returns to the pool
+                cursor.execute("SELECT 1")
+
+        result = pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+        return result.head(limit), fetched > limit
+
+    def close(self) -> None:
+        """
+        Close the pooled cursors and the underlying DuckDB connection.
+        """
+        while True:
+            try:
+                self._idle_cursors.get_nowait().close()
+            except queue.Empty:
+                break
+        self.connection.close()
+
+    @staticmethod
+    def is_single_select(query: str) -> bool:
+        """
+        Check whether a query parses to exactly one SELECT statement.
+
+        Args:
+            query (str): The SQL text to check.
+
+        Returns:
+            bool: False for anything else, including text that does not parse.
+        """
+        try:
+            statements = duckdb.extract_statements(query)
+        except duckdb.Error:
+            return False
+        return len(statements) == 1 and statements[0].type == duckdb.StatementType.SELECT
+
+    @staticmethod
+    def quote_identifier(identifier: str) -> str:
+        """
+        Quote an identifier so it can be safely embedded in a SQL statement.
+
+        Args:
+            identifier (str): Table, schema or column name.
+
+        Returns:
+            str: The double-quoted identifier with embedded quotes escaped.
+        """
+        return '"' + identifier.replace('"', '""') + '"'
 
     def get_columns(
         self, table_name: str, schema_name: Optional[str] = None
@@ -53,13 +200,17 @@ class DuckDBDatastore:
         Returns:
             pd.DataFrame: DataFrame with column information.
         """
-        schema_filter = f"AND table_schema = '{schema_name}'" if schema_name else ""
+        parameters = {"table_name": table_name}
+        schema_filter = ""
+        if schema_name:
+            schema_filter = "AND table_schema = $schema_name"
+            parameters["schema_name"] = schema_name
         query = f"""
         SELECT column_name, data_type, is_nullable, character_maximum_length
         FROM information_schema.columns
-        WHERE table_name = '{table_name}' {schema_filter}
+        WHERE table_name = $table_name {schema_filter}
         """
-        return self.execute(query)
+        return self.execute(query, parameters)
 
     def get_sample_data(
         self, table_name: str, limit: int = 5, schema_name: Optional[str] = None
@@ -75,11 +226,34 @@ class DuckDBDatastore:
         Returns:
             pd.DataFrame: DataFrame with sample data.
         """
-        schema_prefix = f"{schema_name}." if schema_name else ""
+        table_ref = self.quote_identifier(table_name)
+        if schema_name:
+            table_ref = f"{self.quote_identifier(schema_name)}.{table_ref}"
         query = f"""
         SELECT *
-        FROM {schema_prefix}{table_name}
+        FROM {table_ref}
         ORDER BY RANDOM()
-        LIMIT {limit}
+        LIMIT {int(limit)}
         """
         return self.execute(query)
+
+
+@lru_cache(maxsize=4)
+def get_datastore(database: Optional[str] = None, read_only: bool = False) -> DuckDBDatastore:
+    """
+    Return a process-wide DuckDBDatastore for the given database.
+
+    Opening a DuckDB file loads its catalog, so the connection is created once
+    and reused by every caller. It is closed when the interpreter exits.
+
+    Args:
+        database (str, optional): Path to the DuckDB database file.
+                                  If None, an in-memory database is used.
+        read_only (bool, optional): Open the database file read-only.
+
+    Returns:
+        DuckDBDatastore: The shared datastore.
+    """
+    datastore = DuckDBDatastore(database=database, read_only=read_only)
+    atexit.register(datastore.close)
+    return datastore
@@ -1,10 +1,21 @@
 from flask import current_app
-from functools import wraps
+from functools import lru_cache, wraps
 from langfuse import Langfuse
 
 from app.utils import logger
 
 
+@lru_cache(maxsize=1)
+def get_langfuse_client() -> Langfuse:
+    """
+    Return a process-wide Langfuse client.
+
+    The client keeps its own cache of fetched prompts, so reusing it lets repeated
+    prompt lookups be served locally instead of hitting the Langfuse API each time.
+    """
+    return Langfuse()
+
+
 def prompt(name=None):
     """
     Decorator that attempts to fetch and compile a prompt from Langfuse using either the provided name
@@ -35,7 +46,7 @@ def prompt(name=None):
                 current_app.config['LANGFUSE_HOST']
             ]):
                 try:
-                    langfuse_prompt = Langfuse().get_prompt(prompt_name, type="chat")
+                    langfuse_prompt = get_langfuse_client().get_prompt(prompt_name, type="chat")
                     return langfuse_prompt.compile(**kwargs, fallback=func(*args, **kwargs))
                 except Exception as e:
                     return func(*args, **kwargs)
@@ -1,12 +1,17 @@
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
 from flask import current_app
 
 from app import logger
+from app.utils.cache import LRUCache, SingleFlight
 
 from langfuse.decorators import langfuse_context
 from litellm import completion, embedding
 from vaul import StructuredOutput
 
+import hashlib
+import json
+import logging
 import tiktoken
 
 
@@ -94,6 +99,13 @@ class LLMSession:
     DEFAULT_CHAT_MODEL = "us.anthropic.claude-3-5-sonnet-20241022-v2:0"
     DEFAULT_EMBEDDING_MODEL = "amazon.titan-embed-text-v2:0"
 
+    # Shared across sessions; keyed by a hash of the full chat request
+    _chat_cache = LRUCache(maxsize=256, ttl=300)
+    _inflight_chats = SingleFlight()
+
+    # Truncated or filtered responses are never cached
+    CACHEABLE_FINISH_REASONS = ("stop", "tool_calls")
+
     def __init__(
         self,
         chat_model: str = DEFAULT_CHAT_MODEL,
@@ -142,14 +154,15 @@ class LLMSession:
             f"Invalid {model_type} model: {model_name}. Must be one of {[m['name'] for m in models]}"
         )
 
-    def validate_chat_model(self, chat_model: str) -> str:
+    @classmethod
+    def validate_chat_model(cls, chat_model: str) -> str:
         """
         Validate and return the chat model name.
 
         :param chat_model: The chat model to validate.
         :return: Validated chat model name.
         """
-        return self._find_model(self.AVAILABLE_CHAT_MODELS, chat_model, "chat")["name"]
+        return cls._find_model(cls.AVAILABLE_CHAT_MODELS, chat_model, "chat")["name"]
 
     def validate_embedding_model(self, embedding_model: str) -> str:
         """
@@ -195,19 +208,31 @@ class LLMSession:
             "parent_observation_id": langfuse_context.get_current_observation_id(),
         }
 
-    def chat(
+    @staticmethod
+    def _chat_cache_key(chat_config: Dict[str, Any]) -> str:
+        """
+        Build a cache key for a chat request, ignoring tracing metadata.
+
+        :param chat_config: Keyword arguments for the completion call.
+        :return: Hex digest identifying the request.
+        """
+        payload = {key: value for key, value in chat_config.items() if key != "metadata"}
+        serialized = json.dumps(payload, sort_keys=True, default=str)
+        return hashlib.sha1(serialized.encode("utf-8")).hexdigest()
+
+    def _build_chat_config(
         self,
         messages: List[Dict[str, str]],
         tools: Optional[List[Any]] = None,
         **kwargs,
-    ) -> Any:
+    ) -> Dict[str, Any]:
         """
-        Send messages to the chat model and return the response.
+        Build the keyword arguments for a completion call, without tracing metadata.
 
         :param messages: List of message dictionaries.
         :param tools: Optional list of tool dictionaries.
         :param kwargs: Additional parameters for the chat call.
-        :return: Chat model response.
+        :return: Completion keyword arguments.
         """
         chat_config: Dict[str, Any] = {
             "model": self.chat_model,
@@ -225,11 +250,59 @@ class LLMSession:
                 "trace": "enabled",
             }
 
+        return chat_config
+
+    def _get_chat_cache_key(self, chat_config: Dict[str, Any]) -> Optional[str]:
+        """
+        Return the response cache key for a chat request, or None if it must not be cached.
+
+        :param chat_config: Completion keyword arguments.
+        :return: Cache key or None.
+        """
+        if not current_app.config.get("LLM_RESPONSE_CACHE_ENABLED", False):
+            return None
+        if chat_config.get("stream"):
+            return None
+        return self._chat_cache_key(chat_config)
+
+    def chat(
+        self,
+        messages: List[Dict[str, str]],
+        tools: Optional[List[Any]] = None,
+        **kwargs,
+    ) -> Any:
+        """
+        Send messages to the chat model and return the response.
+
+        When LLM_RESPONSE_CACHE_ENABLED is on, identical requests within a few
+        minutes are answered from a shared cache and identical requests made at
+        the same time share a single model call.
+
+        :param messages: List of message dictionaries.
+        :param tools: Optional list of tool dictionaries.
+        :param kwargs: Additional parameters for the chat call.
+        :return: Chat model response.
+        """
+        chat_config = self._build_chat_config(messages, tools, **kwargs)
+
+        cache_key = self._get_chat_cache_key(chat_config)
+        if cache_key:
+            cached = self._chat_cache.get(cache_key)
+            if cached is not None:
+                logger.debug("Serving chat response from cache.")
+                return cached
+
         chat_config.setdefault("metadata", {}).update(self._get_metadata())
 
         try:
-            response = completion(**chat_config)
-            logger.debug(f"Chat response: {response.to_dict()}")
+            if cache_key:
+                response = self._inflight_chats.do(cache_key, completion, **chat_config)
+            else:
+                response = completion(**chat_config)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Chat response: %s", response.to_dict())
+            if cache_key and response.choices[0].finish_reason in self.CACHEABLE_FINISH_REASONS:
+                self._chat_cache.set(cache_key, response)
             return response
         except Exception as e:
             logger.error(f"Error sending messages to chat model: {e}")
@@ -314,27 +387,30 @@ class LLMSession:
         tokenizer = tiktoken.get_encoding("p50k_base")
         token_limit = self._get_chat_model_token_limit(self.chat_model)
 
-        # Tokenize all messages
-        tokenized_messages = []
+        # Count tokens for all messages; only the counts are needed, messages
+        # are either kept whole or dropped, so their content is never re-decoded
+        token_counts = []
         for msg in messages:
             content = msg.get("content", "")
-            tokens = tokenizer.encode(content, disallowed_special=()) if content else []
-            tokenized_messages.append((msg, tokens))
+            token_counts.append(
+                len(tokenizer.encode(content, disallowed_special=())) if content else 0
+            )
 
         # Calculate total token length
-        total_tokens = sum(len(tokens) for _, tokens in tokenized_messages)
+        total_tokens = sum(token_counts)
 
-        # Trim messages from the beginning until we fit within the token limit
-        while total_tokens > token_limit and tokenized_messages:
-            _, removed_tokens = tokenized_messages.pop(0)
-            total_tokens -= len(removed_tokens)
+        # Skip messages from the beginning until we fit within the token limit
+        start = 0
+        while total_tokens > token_limit and start < len(messages):
+            total_tokens -= token_counts[start]
+            start += 1
 
         # Reconstruct the trimmed message history
         trimmed_message_history = []
-        for message, tokens in tokenized_messages:
+        for message in messages[start:]:
             trimmed_message = {
                 "role": message["role"],
-                "content": tokenizer.decode(tokens),
+                "content": message.get("content") or "",
             }
             # Only add tool_calls if non-empty
             tool_calls = message.get("tool_calls", [])
@@ -369,9 +445,24 @@ class LLMSession:
             else:
                 embedding_vector = [0.0] * self.knn_embedding_dimensions
 
-            logger.debug(f"Generated embedding for text: {text}")
+            logger.debug("Generated embedding for text: %s", text)
             return embedding_vector
 
         except Exception as e:
             logger.error(f"Error generating embeddings: {e}")
             raise ValueError("Error generating embeddings.") from e
+
+
+@lru_cache(maxsize=4)
+def get_llm_session(chat_model: str, embedding_model: str) -> LLMSession:
+    """
+    Return a process-wide LLMSession for the given model pair.
+
+    Sessions hold no per-request state, so one instance per (chat_model,
+    embedding_model) is reused instead of re-validating models on every request.
+
+    :param chat_model: The chat model name.
+    :param embedding_model: The embedding model name.
+    :return: The shared LLMSession.
+    """
+    return LLMSession(chat_model=chat_model, embedding_model=embedding_model)
@@ -1,9 +1,48 @@
+import re
+
 from langfuse.decorators import observe
 from vaul import tool_call
 
 from app import logger
-from app.services.datastore.duckdb_datastore import DuckDBDatastore
+from app.services.datastore.duckdb_datastore import DuckDBDatastore, get_datastore
 from app.services.llm.structured_outputs.text_to_sql import SqlQuery
+from app.utils.cache import LRUCache, SingleFlight
+from app.utils.formatters import dataframe_to_markdown
+
+# Database queried by the tool, opened read-only
+DATABASE = "app/data/data.db"
+
+# Rows rendered back to the LLM; larger results are truncated
+MAX_RESULT_ROWS = 100
+
+# Quoted literals and comments (kept verbatim), or whitespace runs outside them
+SQL_TOKEN_PATTERN = re.compile(
+    r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|--[^\n]*(?:\n|$)|/\*[\s\S]*?\*/)|\s+"
+)
+
+# Rendered results keyed by normalized query
+_result_cache = LRUCache(maxsize=256, ttl=300)
+
+# Concurrent identical queries share a single execution
+_inflight_queries = SingleFlight()
+
+
+def _normalize_query(query: str) -> str:
+    # Collapse whitespace outside literals and drop trailing semicolons so that
+    # formatting differences in otherwise identical queries share a cache entry
+    normalized = SQL_TOKEN_PATTERN.sub(lambda match: match.group(1) or " ", query)
+    return normalized.strip().rstrip(";").rstrip()
+
+
+def _render_query(datastore: DuckDBDatastore, query: str) -> str:
+    # Execute the query, fetching only the rows that will be rendered
+    result, truncated = datastore.execute_head(query, MAX_RESULT_ROWS)
+
+    # Render the result, truncated so large result sets don't flood the prompt
+    markdown = dataframe_to_markdown(result, floatfmt=".2f")
+    if truncated:
+        markdown += f"\n\nShowing the first {MAX_RESULT_ROWS} rows; the query returned more."
+    return markdown
 
 
 @tool_call
@@ -11,18 +50,22 @@ from app.services.llm.structured_outputs.text_to_sql import SqlQuery
 def text_to_sql(query: str) -> SqlQuery:
     """A tool for converting natural language queries to SQL queries."""
 
-    logger.info(f"Converting natural language query to SQL query: {query}")
+    logger.debug("Executing SQL query: %s", query)
+
+    # Cursors on the shared datastore are pooled, so anything other than a single
+    # SELECT (temp views, macros, SET) could leak into later, unrelated requests
+    if not DuckDBDatastore.is_single_select(query):
+        raise ValueError("Only a single SELECT statement can be run.")
 
-    # Initialize the DuckDB datastore
-    datastore = DuckDBDatastore(
-        database="app/data/data.db"
-    )
+    # Reuse the shared DuckDB datastore
+    datastore = get_datastore(DATABASE, read_only=True)
 
-    # Execute the query
-    result = datastore.execute(query)
+    cache_key = _normalize_query(query)
+    cached = _result_cache.get(cache_key)
+    if cached is not None:
+        logger.debug("Serving SQL query result from cache.")
+        return cached
 
-    # Return the result
-    return result.to_markdown(
-        index=False, 
-        floatfmt=".2f"
-        ) if result is not None else ""
\ No newline at end of file
+    markdown = _inflight_queries.do(cache_key, _render_query, datastore, query)
+    _result_cache.set(cache_key, markdown)
+    return markdown
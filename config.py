@@ -1,4 +1,5 @@
 import os
+import httpx
 import litellm
 
 basedir = os.path.abspath(os.path.dirname(__file__))
@@ -9,7 +10,11 @@ class Config:
     KNN_EMBEDDING_DIMENSION = int(os.environ.get('KNN_EMBEDDING_DIMENSION', 1536))
     OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
     CHAT_MODEL = os.environ.get("CHAT_MODEL", "gpt-4o-mini")
+    # Optional cheaper model for short, trivial messages; unset sends everything to CHAT_MODEL
+    CHAT_MODEL_FAST = os.environ.get("CHAT_MODEL_FAST")
     EMBEDDING_MODEL = os.environ.get("EMBEDDING_MODEL", "text-embedding-3-small")
+    # Off by default: cached completions are replayed verbatim to anyone sending the same conversation
+    LLM_RESPONSE_CACHE_ENABLED = os.environ.get("LLM_RESPONSE_CACHE_ENABLED", "false").lower() == "true"
 
     # Langfuse
     LANGFUSE_PUBLIC_KEY = os.environ.get('LANGFUSE_PUBLIC_KEY')
@@ -23,6 +28,15 @@ class Config:
         litellm.success_callback = ["default"]
         litellm.failure_callback = ["default"]
 
+    # Shared HTTP client so LiteLLM reuses keep-alive connections across requests
+    litellm.client_session = httpx.Client(
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+        timeout=httpx.Timeout(600.0, connect=10.0),
+    )
+
+    # Startup
+    WARMUP_ON_START = os.environ.get("WARMUP_ON_START", "false").lower() == "true"
+
     # Environment
     ENV_VARS = []  # List of environment variables to pass to the container/batch
 